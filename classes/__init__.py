@@ -1,3 +1,4 @@
+from .macro_assistant import MacroAssistant
 from .macro_generator import MacroGenerator
 
-__all__ = ['MacroGenerator'] 
\ No newline at end of file
+__all__ = ['MacroAssistant', 'MacroGenerator'] 
\ No newline at end of file
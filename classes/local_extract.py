@@ -0,0 +1,118 @@
+import difflib
+import re
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Words that carry no information about which field is wanted or what to do with it
+_STOP_WORDS = {
+    "a", "an", "s", "extract", "field", "fetch", "from", "get", "i", "is", "it", "me", "my",
+    "need", "of", "please", "pull", "read", "return", "take", "the", "to", "value", "want",
+    "would", "like", "its", "their", "his", "her"
+}
+
+# Words that name a target field for the result, which the local path cannot honour
+_TARGET_WORDS = {"as", "called", "into", "named"}
+
+# "to" only names a target when it is not part of an infinitive such as "want to extract"
+_INFINITIVE_LEADS = {"want", "wants", "need", "needs", "like", "have", "has", "going", "trying"}
+
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+def _iter_leaf_paths(value: Any, path: str = "") -> Iterator[Tuple[str, str]]:
+    """Yield (path, key) for every scalar leaf, following the first element of lists."""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if not isinstance(key, str) or not _IDENTIFIER_RE.match(key):
+                continue
+            child_path = f"{path}.{key}" if path else key
+            if isinstance(child, (dict, list)):
+                yield from _iter_leaf_paths(child, child_path)
+            else:
+                yield child_path, key
+    elif isinstance(value, list) and value:
+        yield from _iter_leaf_paths(value[0], f"{path}[0]")
+
+def _names_target_field(words: List[str]) -> bool:
+    if _TARGET_WORDS.intersection(words):
+        return True
+    return any(
+        word == "to" and (index == 0 or words[index - 1] not in _INFINITIVE_LEADS)
+        for index, word in enumerate(words)
+    )
+
+def _ancestor_segments(path: str) -> List[str]:
+    return [_normalize(segment.replace("[0]", "")) for segment in path.split(".")[:-1]]
+
+def try_local_extract(
+    user_requirement: str,
+    api_sample: Dict[Any, Any],
+    cutoff: float = 0.85
+) -> Optional[Dict[str, Any]]:
+    """
+    Build an extract_path macro locally when the requirement names a single field in the sample.
+
+    Every meaningful word of the requirement must be accounted for by the matched field:
+    either by its key or by one of its parent keys (e.g. "candidate" in
+    candidate.personalInfo.firstName). Any other word may describe a transformation, so
+    the requirement is left to the model.
+
+    Args:
+        user_requirement: String describing what the user wants to achieve
+        api_sample: Sample API response showing the structure of available data
+        cutoff: Minimum similarity (0-1) between the requirement wording and a field name
+
+    Returns:
+        Macro configuration for the matched field, or None if the requirement is not a
+        plain extraction or no field matches unambiguously
+    """
+    # Explicit paths need the model
+    if "[" in user_requirement or "." in user_requirement.rstrip("."):
+        return None
+    words = _WORD_RE.findall(user_requirement.lower())
+    # The local path always names the result after the source key, so it cannot honour a target field
+    if not words or _names_target_field(words):
+        return None
+    tokens = [word for word in words if word not in _STOP_WORDS]
+    if not tokens:
+        return None
+
+    leaves: Dict[str, List[Tuple[str, str]]] = {}
+    for path, key in _iter_leaf_paths(api_sample):
+        leaves.setdefault(_normalize(key), []).append((path, key))
+    if not leaves:
+        return None
+
+    # Score every run of up to three consecutive tokens against the leaf key names
+    best_score, best_key, best_span = 0.0, None, (0, 0)
+    for size in range(min(3, len(tokens)), 0, -1):
+        for start in range(len(tokens) - size + 1):
+            candidate = "".join(tokens[start:start + size])
+            for match in difflib.get_close_matches(candidate, leaves, n=1, cutoff=cutoff):
+                score = difflib.SequenceMatcher(None, candidate, match).ratio()
+                if score > best_score:
+                    best_score, best_key, best_span = score, match, (start, start + size)
+    if best_key is None:
+        return None
+
+    # Words outside the matched key must name parent keys of the chosen path; this also
+    # picks between identically named fields (e.g. "candidate first name")
+    leftover = tokens[:best_span[0]] + tokens[best_span[1]:]
+    matches = [
+        (path, key) for path, key in leaves[best_key]
+        if all(token in _ancestor_segments(path) for token in leftover)
+    ]
+    if len(matches) != 1:
+        return None
+
+    path, key = matches[0]
+    return {
+        key: {
+            "macro": "standard_macros.extract_path",
+            "kwargs": {
+                "expr": path
+            }
+        }
+    }
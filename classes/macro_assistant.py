@@ -1,35 +1,28 @@
 import json
+import logging
 import os
+import re
+import openai
+import orjson
 from typing import Dict, Any
-from openai import OpenAI
-from time import sleep
 
-class MacroAssistant:
-    def __init__(self, api_key: str, assistant_id: str):
-        self.client = OpenAI(api_key=api_key)
-        self.assistant_id = assistant_id
-        self.thread = None
-        
-    def generate_macro(self, user_requirement: str, api_sample: Dict[Any, Any]) -> Dict[str, Any]:
-        """
-        Generate a macro based on user requirements and sample API response.
-        
-        Args:
-            user_requirement: String describing what the user wants to achieve
-            api_sample: Sample API response showing the structure of available data
-            
-        Returns:
-            Dictionary containing the generated macro configuration
-        """
-        # Create a new thread for each request
-        self.thread = self.client.beta.threads.create()
-        
-        # Create the message
-        message_content = f"""
+from .macro_base import MacroGeneratorBase
+from .macro_cache import MacroCache
+
+logger = logging.getLogger(__name__)
+
+# Leading ```/```json and trailing ``` markdown fences around a JSON payload
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.DOTALL)
+
+def _rejects_response_format(error: "openai.BadRequestError") -> bool:
+    return getattr(error, "param", None) == "response_format" or "response_format" in str(error)
+
+# User message sent for each request; only the requirement and API sample vary
+_MESSAGE_TEMPLATE = """
         User Requirement: {user_requirement}
         
         Sample API Response:
-        {json.dumps(api_sample, indent=2)}
+        {api_sample}
         
         Please generate a macro configuration that satisfies this requirement.
         Remember to respond ONLY with a valid JSON object, no additional text or explanation.
@@ -50,76 +43,79 @@ class MacroAssistant:
             }}
         }}
         """
-        
-        # Add the message to the thread
-        message = self.client.beta.threads.messages.create(
-            thread_id=self.thread.id,
-            role="user",
-            content=message_content
-        )
-        
-        # Run the assistant
-        run = self.client.beta.threads.runs.create(
-            thread_id=self.thread.id,
-            assistant_id=self.assistant_id
+
+class MacroAssistant(MacroGeneratorBase):
+    # Validated macro configurations memoized by (assistant_id, user_requirement, api_sample)
+    _cache = MacroCache()
+
+    def __init__(self, api_key: str, assistant_id: str, json_mode: bool = True):
+        """
+        Args:
+            api_key: OpenAI API key
+            assistant_id: ID of the assistant configured in the OpenAI UI
+            json_mode: Request response_format json_object on each run. Turned off
+                automatically if the assistant's model rejects it (e.g. gpt-4).
+        """
+        self._api_key = api_key
+        self.assistant_id = assistant_id
+        self.json_mode = json_mode
+
+    def _cache_namespace(self) -> str:
+        return self.assistant_id
+
+    async def _generate_macro(self, user_requirement: str, api_sample: Dict[Any, Any]) -> Dict[str, Any]:
+        """Generate and validate a macro configuration without consulting the cache."""
+        message_content = _MESSAGE_TEMPLATE.format(
+            user_requirement=user_requirement,
+            api_sample=orjson.dumps(api_sample).decode()
         )
         
-        # Wait for completion
-        while True:
-            run_status = self.client.beta.threads.runs.retrieve(
-                thread_id=self.thread.id,
-                run_id=run.id
-            )
-            if run_status.status == 'completed':
-                break
-            elif run_status.status in ['failed', 'cancelled', 'expired']:
-                raise ValueError(f"Assistant run failed with status: {run_status.status}")
-            sleep(1)
+        # Create a fresh thread holding the message and run the assistant on it in one call
+        run_kwargs = {
+            "assistant_id": self.assistant_id,
+            "thread": {"messages": [{"role": "user", "content": message_content}]},
+            "poll_interval_ms": 250
+        }
+        if self.json_mode:
+            try:
+                run = await self.client.beta.threads.create_and_run_poll(
+                    response_format={"type": "json_object"}, **run_kwargs
+                )
+            except openai.BadRequestError as e:
+                if not _rejects_response_format(e):
+                    raise
+                # The assistant's model does not support JSON mode; stop asking for it and
+                # rely on the prompt plus markdown-fence stripping instead
+                logger.debug("Assistant %s rejected JSON mode: %s", self.assistant_id, e)
+                self.json_mode = False
+                run = await self.client.beta.threads.create_and_run_poll(**run_kwargs)
+        else:
+            run = await self.client.beta.threads.create_and_run_poll(**run_kwargs)
+        if run.status != 'completed':
+            raise ValueError(f"Assistant run failed with status: {run.status}")
         
-        # Get the response
-        messages = self.client.beta.threads.messages.list(
-            thread_id=self.thread.id
+        # Get the response: the newest message in the thread is the assistant's reply
+        messages = await self.client.beta.threads.messages.list(
+            thread_id=run.thread_id,
+            order="desc",
+            limit=1
         )
-        
-        # Parse the last assistant message
-        last_message = next(msg for msg in messages if msg.role == "assistant")
+        last_message = messages.data[0]
         response_content = last_message.content[0].text.value
         
-        # Debug: Print raw response
-        print("\nDebug - Raw Assistant Response:")
-        print(response_content)
-        print("\nAttempting to parse as JSON...")
+        logger.debug("Raw assistant response: %s", response_content)
         
         try:
-            # Try to clean the response - remove any markdown code block syntax
-            cleaned_response = response_content.strip()
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.startswith("```"):
-                cleaned_response = cleaned_response[3:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
-            cleaned_response = cleaned_response.strip()
-            
-            macro_config = json.loads(cleaned_response)
-            return self._validate_macro(macro_config)
-        except json.JSONDecodeError as e:
-            print(f"\nJSON Parse Error at position {e.pos}: {e.msg}")
-            print(f"Near text: {cleaned_response[max(0, e.pos-50):min(len(cleaned_response), e.pos+50)]}")
-            raise ValueError("Failed to parse assistant response as JSON. Please try again.")
-
-    def _validate_macro(self, macro_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate the generated macro against the schema."""
-        if not isinstance(macro_config, dict):
-            raise ValueError("Generated macro must be a dictionary")
-        
-        # Validate the structure matches our expected format
-        for field_name, config in macro_config.items():
-            if not isinstance(config, dict):
-                raise ValueError(f"Configuration for field '{field_name}' must be a dictionary")
-            if "macro" not in config:
-                raise ValueError(f"Configuration for field '{field_name}' must contain a 'macro' field")
-            if "kwargs" not in config:
-                raise ValueError(f"Configuration for field '{field_name}' must contain a 'kwargs' field")
-            
-        return macro_config 
\ No newline at end of file
+            macro_config = json.loads(response_content)
+        except json.JSONDecodeError:
+            # JSON mode should prevent it, but strip a markdown code fence if one slipped through
+            cleaned_response = _FENCE_RE.sub("", response_content)
+            try:
+                macro_config = json.loads(cleaned_response)
+            except json.JSONDecodeError as e:
+                logger.debug(
+                    "JSON parse error at position %d: %s (near: %s)",
+                    e.pos, e.msg, cleaned_response[max(0, e.pos-50):e.pos+50]
+                )
+                raise ValueError("Failed to parse assistant response as JSON. Please try again.")
+        return self._validate_macro(macro_config)
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Dict, Any, List, Tuple
+
+from openai import AsyncOpenAI
+
+from .local_extract import try_local_extract
+from .macro_cache import MacroCache
+from .macro_schema import validate_macro_config
+from .openai_client import close_shared_http_client, get_async_client, run_sync
+
+class MacroGeneratorBase:
+    """
+    Shared entry points for macro generators.
+
+    Subclasses set self._api_key, implement _generate_macro and may override
+    _cache_namespace; each subclass should define its own class-level _cache.
+    """
+    _cache = MacroCache()
+    _api_key: str
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """OpenAI client bound to the running event loop's shared connection pool."""
+        return get_async_client(self._api_key)
+
+    def generate_macro_sync(self, user_requirement: str, api_sample: Dict[Any, Any]) -> Dict[str, Any]:
+        """Blocking wrapper around generate_macro for callers without an event loop."""
+        return run_sync(self.generate_macro(user_requirement, api_sample))
+
+    async def generate_macros_bulk(
+        self,
+        items: List[Tuple[str, Dict[Any, Any]]],
+        limit: int = 20,
+        return_exceptions: bool = True
+    ) -> List[Any]:
+        """
+        Generate macros for many (user_requirement, api_sample) pairs concurrently.
+
+        Args:
+            items: List of (user_requirement, api_sample) tuples
+            limit: Maximum number of requests in flight at once (at least 1)
+            return_exceptions: If True, failed items yield their exception instead of aborting the batch
+
+        Returns:
+            List of macro configurations (or exceptions), in the same order as items
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        semaphore = asyncio.Semaphore(limit)
+
+        async def _generate(user_requirement: str, api_sample: Dict[Any, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.generate_macro(user_requirement, api_sample)
+
+        coros = [_generate(user_requirement, api_sample) for user_requirement, api_sample in items]
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the HTTP connection pool shared by OpenAI clients on the running event loop."""
+        await close_shared_http_client()
+
+    async def __aenter__(self) -> "MacroGeneratorBase":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Close the running loop's connection pool when leaving an `async with` block."""
+        await self.close()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all memoized macro configurations."""
+        cls._cache.clear()
+
+    async def generate_macro(
+        self,
+        user_requirement: str,
+        api_sample: Dict[Any, Any],
+        use_cache: bool = True,
+        use_local: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Generate a macro based on user requirements and sample API response.
+
+        Args:
+            user_requirement: String describing what the user wants to achieve
+            api_sample: Sample API response showing the structure of available data
+            use_cache: If False, bypass the memoized results
+            use_local: If False, skip the local shortcut for plain single-field extractions
+
+        Returns:
+            Dictionary containing the generated macro configuration
+        """
+        # Plain single-field extractions are resolved locally without calling OpenAI
+        if use_local:
+            macro_config = try_local_extract(user_requirement, api_sample)
+            if macro_config is not None:
+                return macro_config
+
+        if not use_cache:
+            return await self._generate_macro(user_requirement, api_sample)
+
+        key = MacroCache.make_key(user_requirement, api_sample, namespace=self._cache_namespace())
+        macro_config = self._cache.get(key)
+        if macro_config is None:
+            macro_config = await self._generate_macro(user_requirement, api_sample)
+            self._cache.put(key, macro_config)
+        return macro_config
+
+    def _cache_namespace(self) -> str:
+        """Settings that change the generated output, so differently configured instances never share entries."""
+        return ""
+
+    async def _generate_macro(self, user_requirement: str, api_sample: Dict[Any, Any]) -> Dict[str, Any]:
+        """Generate and validate a macro configuration without consulting the cache."""
+        raise NotImplementedError
+
+    def _validate_macro(self, macro_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate the generated macro against the schema."""
+        return validate_macro_config(macro_config)
@@ -0,0 +1,37 @@
+import copy
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import orjson
+
+class MacroCache:
+    """Bounded LRU cache of validated macro configurations keyed by request inputs."""
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def make_key(user_requirement: str, api_sample: Dict[Any, Any], namespace: str = "") -> str:
+        """Build a stable key from the requirement and a canonical (sorted-key) form of the sample."""
+        payload = orjson.dumps((namespace, user_requirement, api_sample), option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached configuration, or None on a miss."""
+        macro_config = self._entries.get(key)
+        if macro_config is None:
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(macro_config)
+
+    def put(self, key: str, macro_config: Dict[str, Any]) -> None:
+        """Store a configuration, evicting the least recently used entry when full."""
+        self._entries[key] = copy.deepcopy(macro_config)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
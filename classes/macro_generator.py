@@ -1,44 +1,20 @@
 import json
+import logging
 import os
-from typing import Dict, Any
-from openai import OpenAI
+import orjson
+from collections import Counter
+from typing import Dict, Any, List, Tuple
 
-class MacroGenerator:
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
-        
-        # Get the absolute path to the project root directory
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
-        # Load macro definitions for reference
-        macro_def_path = os.path.join(project_root, 'examples', 'macro_definitions.json')
-        with open(macro_def_path, 'r') as f:
-            self.macro_definitions = json.load(f)
-            
-        # Load example macro usage
-        example_usage_path = os.path.join(project_root, 'examples', 'example_macro_usage.json')
-        with open(example_usage_path, 'r') as f:
-            self.example_usage = json.load(f)
-
-    def generate_macro(self, user_requirement: str, api_sample: Dict[Any, Any]) -> Dict[str, Any]:
-        """
-        Generate a macro based on user requirements and sample API response.
-        
-        Args:
-            user_requirement: String describing what the user wants to achieve
-            api_sample: Sample API response showing the structure of available data
-            
-        Returns:
-            Dictionary containing the generated macro configuration
-        """
-        # Construct the prompt for OpenAI
-        prompt = self._construct_prompt(user_requirement, api_sample)
-        
-        # Call OpenAI API
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": """You are an expert at creating macros for data transformation.
+from .macro_base import MacroGeneratorBase
+from .macro_cache import MacroCache
+
+logger = logging.getLogger(__name__)
+
+# Models tried in order, cheapest first; later tiers only run when earlier output is invalid
+DEFAULT_MODEL_TIERS = ("gpt-4o-mini", "gpt-4o", "gpt-4-turbo")
+
+# The system message is identical for every request, so it is built once per examples setting
+_SYSTEM_CONTENT = """You are an expert at creating macros for data transformation.
                 Your task is to generate a macro configuration that maps external API data to internal fields.
                 The response MUST be a valid JSON object in the format:
                 {
@@ -52,75 +28,209 @@ class MacroGenerator:
                 
                 For path extraction, use standard_macros.extract_path with the expr parameter.
                 For combining multiple fields, use standard_macros.chained_macro with adapter_macros.substitute_template.
-                Follow the examples from the example_macro_usage.json file exactly.
-                
-                IMPORTANT: Respond ONLY with the JSON object, no additional text or explanation."""},
+                {examples_instruction}
+                IMPORTANT: Respond ONLY with the JSON object, no additional text or explanation."""
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": _SYSTEM_CONTENT.replace(
+        "{examples_instruction}",
+        "Follow the examples from the example_macro_usage.json file exactly.\n                "
+    )
+}
+_SYSTEM_MESSAGE_NO_EXAMPLES = {
+    "role": "system",
+    "content": _SYSTEM_CONTENT.replace("{examples_instruction}", "")
+}
+
+# Representative macro configurations shown to the model in every prompt
+_RELEVANT_EXAMPLES = {
+    "path_extraction": {
+        "custom_info.LevelName": {
+            "macro": "standard_macros.extract_path",
+            "kwargs": {
+                "expr": "cust_JobCodeNav.results[0].jobLevelNav.picklistLabels.results[0].label"
+            }
+        }
+    },
+    "field_combination": {
+        "role_description": {
+            "macro": "standard_macros.chained_macro",
+            "kwargs": {
+                "inner_macro_list": [
+                    {
+                        "macro": "adapter_macros.substitute_template",
+                        "kwargs": {
+                            "template_string": "{{ longDesciptions.results[0].desc_localized }} {{ headers.results[0].desc_defaultValue }} {{ jobResponsibilityContents.results[0].entityNav.name_defaultValue }}"
+                        }
+                    }
+                ]
+            }
+        }
+    }
+}
+_RELEVANT_EXAMPLES_JSON = json.dumps(_RELEVANT_EXAMPLES, indent=2)
+_EXAMPLES_SECTION = f"""
+        Example Macro Configurations:
+        {_RELEVANT_EXAMPLES_JSON}
+        """
+
+
+class MacroGenerator(MacroGeneratorBase):
+    # Parsed definitions keyed by absolute path: (mtime, parsed JSON, derived data...)
+    _DEFS_CACHE: Dict[str, Tuple[float, Dict[str, Any], List[Dict[str, str]], str]] = {}
+    # Validated macro configurations memoized by (user_requirement, api_sample)
+    _cache = MacroCache()
+    # Per-model attempt and success counts across all instances
+    _tier_attempts: Counter = Counter()
+    _tier_successes: Counter = Counter()
+
+    def __init__(
+        self,
+        api_key: str,
+        use_examples: bool = True,
+        model_tiers: Tuple[str, ...] = DEFAULT_MODEL_TIERS
+    ):
+        """
+        Args:
+            api_key: OpenAI API key
+            use_examples: Include example macro configurations in every prompt
+            model_tiers: Models to try in order, cheapest first, escalating on invalid output
+        """
+        if not model_tiers:
+            raise ValueError("At least one model tier is required")
+        self._api_key = api_key
+        self.use_examples = use_examples
+        self.model_tiers = tuple(model_tiers)
+        
+        # Get the absolute path to the project root directory
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        
+        # Load macro definitions for reference, reusing the parsed file across instances
+        macro_def_path = os.path.join(project_root, 'examples', 'macro_definitions.json')
+        (
+            self.macro_definitions,
+            self._available_macros,
+            self._available_macros_json
+        ) = self._load_definitions(macro_def_path)
+        self._system_message = _SYSTEM_MESSAGE if use_examples else _SYSTEM_MESSAGE_NO_EXAMPLES
+
+    @classmethod
+    def _load_definitions(cls, path: str) -> Tuple[Dict[str, Any], List[Dict[str, str]], str]:
+        """
+        Load macro definitions, cached by mtime.
+        
+        Returns:
+            The parsed definitions, the available-macros summary list, and that list
+            serialized for the prompt, so prompt construction never walks the schemas
+        """
+        mtime = os.path.getmtime(path)
+        cached = cls._DEFS_CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1:]
+
+        with open(path, 'r') as f:
+            macro_definitions = json.load(f)
+
+        available_macros = [
+            {
+                'name': schema['macro_name'],
+                'description': schema.get('description', ''),
+                'type': schema.get('macro_type', '')
+            }
+            for schema in macro_definitions['macros']['docstring_schema']
+            if 'macro_name' in schema
+        ]
+        available_macros_json = orjson.dumps(available_macros, option=orjson.OPT_INDENT_2).decode()
+
+        cls._DEFS_CACHE[path] = (mtime, macro_definitions, available_macros, available_macros_json)
+        return macro_definitions, available_macros, available_macros_json
+
+    def _cache_namespace(self) -> str:
+        return orjson.dumps([self.use_examples, self.model_tiers]).decode()
+
+    @classmethod
+    def tier_success_rates(cls) -> Dict[str, float]:
+        """Fraction of attempts per model that produced a valid macro configuration."""
+        return {
+            model: cls._tier_successes[model] / attempts
+            for model, attempts in cls._tier_attempts.items()
+        }
+
+    async def _generate_macro(self, user_requirement: str, api_sample: Dict[Any, Any]) -> Dict[str, Any]:
+        """
+        Generate and validate a macro configuration without consulting the cache.
+        
+        Models are tried cheapest first; an invalid configuration from one tier
+        escalates the request to the next.
+        """
+        # Construct the prompt for OpenAI
+        prompt = self._construct_prompt(user_requirement, api_sample)
+        
+        error = None
+        for model in self.model_tiers:
+            self._tier_attempts[model] += 1
+            try:
+                macro_config = await self._request_macro(model, prompt)
+            except ValueError as e:
+                logger.debug("Model %s produced an invalid macro configuration: %s", model, e)
+                error = e
+                continue
+            self._tier_successes[model] += 1
+            return macro_config
+        raise error
+
+    async def _request_macro(self, model: str, prompt: str) -> Dict[str, Any]:
+        """Request a macro configuration from a single model and validate it."""
+        # Call OpenAI API, streaming so malformed output can be rejected before it finishes
+        stream = await self.client.chat.completions.create(
+            model=model,
+            messages=[
+                self._system_message,
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.1
+            temperature=0.1,
+            response_format={"type": "json_object"},
+            stream=True
         )
         
+        parts = []
+        started = False
+        try:
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                content = chunk.choices[0].delta.content
+                parts.append(content)
+                # A macro configuration is always a JSON object; abort as soon as the output clearly is not one
+                if not started and content.strip():
+                    started = True
+                    if not content.lstrip().startswith("{"):
+                        raise ValueError("Failed to generate valid macro configuration")
+        finally:
+            await stream.close()
+        
         # Parse the response
         try:
-            macro_config = json.loads(response.choices[0].message.content)
+            macro_config = orjson.loads("".join(parts))
             return self._validate_macro(macro_config)
-        except json.JSONDecodeError as e:
-            raise ValueError("Failed to generate valid macro configuration")
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Failed to generate valid macro configuration: {e}") from e
 
     def _construct_prompt(self, user_requirement: str, api_sample: Dict[Any, Any]) -> str:
         """Construct the prompt for OpenAI with context about available macros and requirements."""
-        available_macros = []
-        for schema in self.macro_definitions['macros']['docstring_schema']:
-            if 'macro_name' in schema:
-                available_macros.append({
-                    'name': schema['macro_name'],
-                    'description': schema.get('description', ''),
-                    'type': schema.get('macro_type', '')
-                })
-
-        # Extract relevant examples from example usage
-        relevant_examples = {
-            "path_extraction": {
-                "custom_info.LevelName": {
-                    "macro": "standard_macros.extract_path",
-                    "kwargs": {
-                        "expr": "cust_JobCodeNav.results[0].jobLevelNav.picklistLabels.results[0].label"
-                    }
-                }
-            },
-            "field_combination": {
-                "role_description": {
-                    "macro": "standard_macros.chained_macro",
-                    "kwargs": {
-                        "inner_macro_list": [
-                            {
-                                "macro": "adapter_macros.substitute_template",
-                                "kwargs": {
-                                    "template_string": "{{ longDesciptions.results[0].desc_localized }} {{ headers.results[0].desc_defaultValue }} {{ jobResponsibilityContents.results[0].entityNav.name_defaultValue }}"
-                                }
-                            }
-                        ]
-                    }
-                }
-            }
-        }
-
         return f"""
         Based on the following information, generate a macro configuration:
 
         User Requirement: {user_requirement}
         
         Sample API Response:
-        {json.dumps(api_sample, indent=2)}
+        {orjson.dumps(api_sample).decode()}
         
         Available Macros:
-        {json.dumps(available_macros, indent=2)}
-        
-        Example Macro Configurations:
-        {json.dumps(relevant_examples, indent=2)}
-        
+        {self._available_macros_json}
+        {_EXAMPLES_SECTION if self.use_examples else ""}
         The macro configuration must:
-        1. Follow the exact format shown in the examples
+        1. Follow the exact format shown in the {"examples" if self.use_examples else "instructions"}
         2. Include the target field name as the top-level key
         3. Use standard_macros.extract_path for path extraction with expr parameter
         4. Use standard_macros.chained_macro with adapter_macros.substitute_template for combining fields
@@ -128,19 +238,3 @@ class MacroGenerator:
         
         Respond ONLY with the JSON object, no additional text or explanation.
         """
-
-    def _validate_macro(self, macro_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate the generated macro against the schema."""
-        if not isinstance(macro_config, dict):
-            raise ValueError("Generated macro must be a dictionary")
-        
-        # Validate the structure matches our expected format
-        for field_name, config in macro_config.items():
-            if not isinstance(config, dict):
-                raise ValueError(f"Configuration for field '{field_name}' must be a dictionary")
-            if "macro" not in config:
-                raise ValueError(f"Configuration for field '{field_name}' must contain a 'macro' field")
-            if "kwargs" not in config:
-                raise ValueError(f"Configuration for field '{field_name}' must contain a 'kwargs' field")
-            
-        return macro_config 
\ No newline at end of file
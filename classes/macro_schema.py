@@ -0,0 +1,26 @@
+from typing import Dict, Any
+
+import fastjsonschema
+
+# Every top-level key is a target field mapped to a macro invocation
+MACRO_CONFIG_SCHEMA = {
+    "type": "object",
+    "additionalProperties": {
+        "type": "object",
+        "required": ["macro", "kwargs"],
+        "properties": {
+            "macro": {"type": "string"},
+            "kwargs": {"type": "object"}
+        }
+    }
+}
+
+_validate = fastjsonschema.compile(MACRO_CONFIG_SCHEMA)
+
+def validate_macro_config(macro_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a generated macro configuration, raising ValueError if it does not match the schema."""
+    try:
+        _validate(macro_config)
+    except fastjsonschema.JsonSchemaException as e:
+        raise ValueError(f"Invalid macro configuration: {e.message}") from e
+    return macro_config
@@ -0,0 +1,121 @@
+import asyncio
+import atexit
+import threading
+import weakref
+from typing import Any, Coroutine, Dict, List, Optional, TypeVar
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+T = TypeVar("T")
+
+class _LoopClients:
+    """The shared HTTP pool of one event loop and the OpenAI clients built on it."""
+
+    def __init__(self):
+        self.http_client = DefaultAsyncHttpxClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+        self.openai_clients: Dict[str, AsyncOpenAI] = {}
+
+# Connections are bound to the event loop that opened them, so each loop gets its own pool.
+# The pool is stored as an attribute of the loop itself: its connections reference the loop,
+# so holding it from a module global would keep every finished loop (and its sockets) alive.
+_LOOP_ATTR = "_macro_loop_clients"
+
+# Fallback for loop implementations that reject new attributes; pools stored here stay alive
+# until close_shared_http_client() is awaited on their loop
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClients]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Event loop reused by run_sync, one per thread so concurrent sync callers never share a loop
+_thread_state = threading.local()
+_sync_loops: List[asyncio.AbstractEventLoop] = []
+_sync_loops_lock = threading.Lock()
+
+def _get_loop_clients(loop: asyncio.AbstractEventLoop) -> Optional[_LoopClients]:
+    loop_clients = getattr(loop, _LOOP_ATTR, None)
+    if loop_clients is None:
+        loop_clients = _http_clients.get(loop)
+    return loop_clients
+
+def _set_loop_clients(loop: asyncio.AbstractEventLoop, loop_clients: Optional[_LoopClients]) -> None:
+    try:
+        setattr(loop, _LOOP_ATTR, loop_clients)
+    except AttributeError:
+        if loop_clients is None:
+            _http_clients.pop(loop, None)
+        else:
+            _http_clients[loop] = loop_clients
+
+def _loop_clients() -> _LoopClients:
+    loop = asyncio.get_running_loop()
+    loop_clients = _get_loop_clients(loop)
+    if loop_clients is None or loop_clients.http_client.is_closed:
+        loop_clients = _LoopClients()
+        _set_loop_clients(loop, loop_clients)
+    return loop_clients
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """Return the HTTP client shared on the running event loop, creating it on first use."""
+    return _loop_clients().http_client
+
+def get_async_client(api_key: str) -> AsyncOpenAI:
+    """
+    Return an AsyncOpenAI client for the running event loop, backed by that loop's shared pool.
+
+    Must be called from inside a coroutine.
+    """
+    loop_clients = _loop_clients()
+    client = loop_clients.openai_clients.get(api_key)
+    if client is None:
+        client = AsyncOpenAI(api_key=api_key, http_client=loop_clients.http_client)
+        loop_clients.openai_clients[api_key] = client
+    return client
+
+async def close_shared_http_client() -> None:
+    """
+    Close the running event loop's shared HTTP client.
+
+    Pools are released with their loop once it is garbage collected, but callers driving
+    their own loop (e.g. asyncio.run) can await this, or use a generator as an async
+    context manager, to close connections deterministically. The next client created on
+    the loop opens a fresh pool.
+    """
+    loop = asyncio.get_running_loop()
+    loop_clients = _get_loop_clients(loop)
+    _set_loop_clients(loop, None)
+    if loop_clients is not None:
+        await loop_clients.http_client.aclose()
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Unlike asyncio.run, every call on the same thread reuses that thread's event loop, so
+    keep-alive connections in its pool remain usable between calls.
+    """
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_state.loop = loop
+        with _sync_loops_lock:
+            _sync_loops.append(loop)
+    return loop.run_until_complete(coro)
+
+@atexit.register
+def _close_at_exit() -> None:
+    """Release pooled connections and the run_sync event loops on interpreter shutdown."""
+    with _sync_loops_lock:
+        loops = list(_sync_loops)
+        _sync_loops.clear()
+    for loop in loops:
+        if loop.is_closed() or loop.is_running():
+            continue
+        try:
+            loop.run_until_complete(close_shared_http_client())
+        except Exception:
+            pass
+        loop.close()
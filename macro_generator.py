@@ -1,8 +1,20 @@
 import os
 import json
 import argparse
+import functools
+import logging
 from dotenv import load_dotenv
-from classes.macro_assistant import MacroAssistant
+from classes import MacroAssistant
+from classes.openai_client import run_sync
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_API_RESPONSE_PATH = os.path.join(_PROJECT_ROOT, 'examples', 'example_api_response.json')
+
+# Load environment variables from .env file once, unless already provided by the environment
+if not (os.getenv("OPENAI_API_KEY") and os.getenv("OPENAI_ASSISTANT_ID")):
+    load_dotenv()
 
 def load_api_response(file_path: str) -> dict:
     """Load and validate the API response from a JSON file."""
@@ -14,15 +26,43 @@ def load_api_response(file_path: str) -> dict:
     except FileNotFoundError:
         raise ValueError(f"File not found: {file_path}")
 
+@functools.lru_cache(maxsize=None)
+def _default_api_response() -> dict:
+    """Load the bundled example API response, parsing it at most once per process."""
+    return load_api_response(_DEFAULT_API_RESPONSE_PATH)
+
+def run_bulk(assistant: MacroAssistant, batch: list) -> None:
+    """Generate macros for a batch of {"requirement": ..., "api_sample": ...} entries concurrently."""
+    items = []
+    for entry in batch:
+        if not isinstance(entry, dict) or "requirement" not in entry or "api_sample" not in entry:
+            raise ValueError("Each batch entry must be an object with 'requirement' and 'api_sample' keys")
+        items.append((entry["requirement"], entry["api_sample"]))
+
+    results = run_sync(assistant.generate_macros_bulk(items))
+    for (user_requirement, _), result in zip(items, results):
+        print(f"\nRequirement: {user_requirement}")
+        if isinstance(result, Exception):
+            logger.error("Error generating macro: %s", result)
+        else:
+            print(json.dumps(result, indent=2))
+
 def main():
+    # INFO only for this script's own messages; the root logger stays at WARNING so
+    # httpx does not log every request (including each run poll)
+    logging.basicConfig(format="%(message)s")
+    logger.setLevel(logging.INFO)
+
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Generate macros based on user requirements and API response')
-    parser.add_argument('--api-response', type=str, help='Path to the JSON file containing the API response')
+    parser.add_argument(
+        '--api-response',
+        type=str,
+        help='Path to the JSON file containing the API response, or a JSON array of '
+             '{"requirement": ..., "api_sample": ...} objects to generate in bulk'
+    )
     args = parser.parse_args()
 
-    # Load environment variables from .env file
-    load_dotenv()
-    
     # Get OpenAI API key and Assistant ID from environment variables
     api_key = os.getenv("OPENAI_API_KEY")
     assistant_id = os.getenv("OPENAI_ASSISTANT_ID")
@@ -47,12 +87,13 @@ def main():
     # Load API response
     if args.api_response:
         api_sample = load_api_response(args.api_response)
+        if isinstance(api_sample, list):
+            run_bulk(assistant, api_sample)
+            return
     else:
         # Use default example if no file provided
-        project_root = os.path.dirname(os.path.abspath(__file__))
-        default_response_path = os.path.join(project_root, 'examples', 'example_api_response.json')
-        print(f"\nNo API response file provided. Using default example from: {default_response_path}")
-        api_sample = load_api_response(default_response_path)
+        logger.info("No API response file provided. Using default example from: %s", _DEFAULT_API_RESPONSE_PATH)
+        api_sample = _default_api_response()
     
     # Get user requirement
     print("\nPlease describe what you want to extract or transform from the API response.")
@@ -63,11 +104,11 @@ def main():
         raise ValueError("Requirement cannot be empty")
     
     try:
-        macro = assistant.generate_macro(user_requirement, api_sample)
+        macro = assistant.generate_macro_sync(user_requirement, api_sample)
         print("\nGenerated Macro:")
         print(json.dumps(macro, indent=2))
     except Exception as e:
-        print(f"\nError generating macro: {str(e)}")
+        logger.error("Error generating macro: %s", e)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
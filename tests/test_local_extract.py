@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+
+from classes.local_extract import try_local_extract
+
+EXAMPLE_RESPONSE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'example_api_response.json'
+)
+
+@pytest.fixture
+def api_sample():
+    with open(EXAMPLE_RESPONSE_PATH, 'r') as f:
+        return json.load(f)
+
+def _extract_path(field, expr):
+    return {field: {"macro": "standard_macros.extract_path", "kwargs": {"expr": expr}}}
+
+@pytest.mark.parametrize("requirement, field, expr", [
+    ("I want to extract the candidate's first name", "firstName", "candidate.personalInfo.firstName"),
+    ("extract the first name", "firstName", "candidate.personalInfo.firstName"),
+    ("get last name", "lastName", "candidate.personalInfo.lastName"),
+    ("the candidate's firstname.", "firstName", "candidate.personalInfo.firstName"),
+])
+def test_plain_extraction_is_resolved_locally(api_sample, requirement, field, expr):
+    assert try_local_extract(requirement, api_sample) == _extract_path(field, expr)
+
+@pytest.mark.parametrize("requirement", [
+    # Transformations the bare path would silently drop
+    "get the last name in uppercase",
+    "first name lowercased",
+    "count of first names",
+    "extract the first name without accents",
+    "I need to combine first and last name",
+    "I want to extract the createdDateTime timestamp in a human readable format",
+    # Requirements naming a target field
+    "I want a new field called candidate_first that pulls the first name",
+    "map first name to given_name",
+    "store the first name as given_name",
+    # Explicit paths and fields that do not exist
+    "pull candidate.personalInfo.firstName",
+    "extract the candidate's name",
+    "",
+])
+def test_other_requirements_fall_back_to_the_model(api_sample, requirement):
+    assert try_local_extract(requirement, api_sample) is None
+
+def test_parent_keys_disambiguate_identically_named_fields():
+    api_sample = {"job": {"results": [{"name": "Engineer"}]}, "company": {"name": "Acme"}}
+    assert try_local_extract("get company name", api_sample) == _extract_path("name", "company.name")
+    assert try_local_extract("get job name", api_sample) == _extract_path("name", "job.results[0].name")
+    assert try_local_extract("get name", api_sample) is None
@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from classes import MacroAssistant
+
+MACRO_JSON = '{"full_name": {"macro": "standard_macros.chained_macro", "kwargs": {}}}'
+
+def _bad_request(param):
+    request = httpx.Request("POST", "https://api.openai.com/v1/threads/runs")
+    return openai.BadRequestError(
+        f"Invalid parameter: {param}",
+        response=httpx.Response(400, request=request),
+        body={"message": f"Invalid parameter: {param}", "param": param, "type": "invalid_request_error"}
+    )
+
+class _FakeThreads:
+    def __init__(self, reject_param=None, reply=MACRO_JSON):
+        self.reject_param = reject_param
+        self.reply = reply
+        self.run_calls = []
+        self.messages = SimpleNamespace(list=self._list_messages)
+
+    async def create_and_run_poll(self, **kwargs):
+        self.run_calls.append(kwargs)
+        if self.reject_param and (self.reject_param != "response_format" or "response_format" in kwargs):
+            raise _bad_request(self.reject_param)
+        return SimpleNamespace(status="completed", thread_id="thread_1")
+
+    async def _list_messages(self, **kwargs):
+        text = SimpleNamespace(value=self.reply)
+        return SimpleNamespace(data=[SimpleNamespace(content=[SimpleNamespace(text=text)])])
+
+class _FakeAssistant(MacroAssistant):
+    def __init__(self, threads, **kwargs):
+        super().__init__("test-key", "asst_test", **kwargs)
+        self.threads = threads
+
+    @property
+    def client(self):
+        return SimpleNamespace(beta=SimpleNamespace(threads=self.threads))
+
+def _generate(assistant, requirement="combine first and last name"):
+    return asyncio.run(assistant.generate_macro(requirement, {}, use_cache=False))
+
+def test_json_mode_is_requested_by_default():
+    threads = _FakeThreads()
+    assert "full_name" in _generate(_FakeAssistant(threads))
+    assert threads.run_calls[0]["response_format"] == {"type": "json_object"}
+
+def test_falls_back_when_model_rejects_json_mode():
+    threads = _FakeThreads(reject_param="response_format", reply=f"```json\n{MACRO_JSON}\n```")
+    assistant = _FakeAssistant(threads)
+
+    assert "full_name" in _generate(assistant)
+    assert not assistant.json_mode
+    assert "response_format" in threads.run_calls[0]
+    assert "response_format" not in threads.run_calls[1]
+
+    # Later requests skip JSON mode without another rejected call
+    _generate(assistant, "combine last and first name")
+    assert len(threads.run_calls) == 3
+    assert "response_format" not in threads.run_calls[2]
+
+def test_json_mode_can_be_disabled_up_front():
+    threads = _FakeThreads()
+    _generate(_FakeAssistant(threads, json_mode=False))
+    assert "response_format" not in threads.run_calls[0]
+
+def test_other_bad_requests_are_not_swallowed():
+    threads = _FakeThreads(reject_param="assistant_id")
+    with pytest.raises(openai.BadRequestError):
+        _generate(_FakeAssistant(threads))
+    assert len(threads.run_calls) == 1
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from classes.macro_base import MacroGeneratorBase
+from classes.macro_cache import MacroCache
+
+API_SAMPLE = {"candidate": {"personalInfo": {"firstName": "John", "lastName": "Doe"}}}
+
+class _RecordingGenerator(MacroGeneratorBase):
+    _cache = MacroCache()
+
+    def __init__(self):
+        self.calls = 0
+
+    async def _generate_macro(self, user_requirement, api_sample):
+        self.calls += 1
+        return {"generated": {"macro": "standard_macros.chained_macro", "kwargs": {}}}
+
+def test_generate_macro_uses_local_path_by_default():
+    generator = _RecordingGenerator()
+    macro_config = asyncio.run(generator.generate_macro("extract the first name", API_SAMPLE))
+    assert macro_config == {
+        "firstName": {
+            "macro": "standard_macros.extract_path",
+            "kwargs": {"expr": "candidate.personalInfo.firstName"}
+        }
+    }
+    assert generator.calls == 0
+
+def test_generate_macro_use_local_false_skips_local_path():
+    generator = _RecordingGenerator()
+    macro_config = asyncio.run(
+        generator.generate_macro("extract the first name", API_SAMPLE, use_cache=False, use_local=False)
+    )
+    assert "generated" in macro_config
+    assert generator.calls == 1
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_generate_macros_bulk_rejects_non_positive_limit(limit):
+    generator = _RecordingGenerator()
+    with pytest.raises(ValueError, match="limit must be at least 1"):
+        asyncio.run(generator.generate_macros_bulk([("combine a and b", {})], limit=limit))
+    assert generator.calls == 0
@@ -0,0 +1,62 @@
+import asyncio
+import gc
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from classes import MacroGenerator
+from classes import openai_client
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+def test_repeated_asyncio_run_does_not_keep_loops_or_pools_alive(server_url):
+    loops = []
+
+    async def request():
+        loops.append(weakref.ref(asyncio.get_running_loop()))
+        response = await openai_client.get_shared_http_client().get(server_url)
+        assert response.status_code == 200
+
+    for _ in range(5):
+        asyncio.run(request())
+    gc.collect()
+
+    assert len(openai_client._http_clients) == 0
+    assert all(loop() is None for loop in loops)
+
+def test_async_with_closes_the_running_loop_pool(server_url):
+    async def request():
+        async with MacroGenerator("test-key") as generator:
+            http_client = openai_client.get_shared_http_client()
+            await http_client.get(server_url)
+            assert generator.client is openai_client.get_async_client("test-key")
+        return http_client
+
+    assert asyncio.run(request()).is_closed
+
+def test_run_sync_reuses_one_pool_per_thread():
+    async def pool_id():
+        return id(openai_client.get_shared_http_client())
+
+    assert openai_client.run_sync(pool_id()) == openai_client.run_sync(pool_id())